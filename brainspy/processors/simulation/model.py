@@ -1,11 +1,60 @@
 """
 Module for creating and using a neural network model.
 """
+import copy
 import warnings
 
 import torch
 from torch import nn
 
+# Key, default value and the warning raised when the key is missing, for
+# each entry of the model structure.
+_DEFAULT_STRUCTURE = tuple(
+    (key, default, "The model loaded does not define the "
+     f"{description} as expected. Changed it to default value: {shown}.")
+    for key, default, description, shown in (
+        ("activation", "relu", "activation", "relu"),
+        ("D_in", 7, "input dimension", 7),
+        ("D_out", 1, "output dimension", 1),
+        ("hidden_sizes", [90] * 6, "hidden layer sizes", "6 layers of 90"),
+    ))
+
+# Activation classes by the name used in the model structure.
+_ACTIVATIONS = {
+    "relu": nn.ReLU,
+    "elu": nn.ELU,
+    "tanh": nn.Tanh,
+    "hard-tanh": nn.Hardtanh,
+    "sigmoid": nn.Sigmoid,
+}
+
+
+class FusedLinearReLU(nn.Linear):
+    """
+    A linear layer followed by a ReLU activation. The activation is applied
+    in place on the output of the affine transformation (a single addmm call
+    for batched inputs), which avoids allocating an intermediate tensor and
+    dispatching a separate activation module.
+
+    It has the same parameters as nn.Linear (weight and bias), so it can
+    load the state dictionary of a linear layer.
+    """
+    def forward(self, x: torch.Tensor) -> torch.Tensor:
+        """
+        Apply the linear transformation and the ReLU activation.
+
+        Parameters
+        ----------
+        x : torch.Tensor
+            Input data.
+
+        Returns
+        -------
+        torch.Tensor
+            Output data.
+        """
+        return nn.functional.linear(x, self.weight, self.bias).relu_()
+
 
 class NeuralNetworkModel(nn.Module):
     """
@@ -20,6 +69,8 @@ class NeuralNetworkModel(nn.Module):
         Indicate whether to print certain steps.
     raw_model : nn.Sequential
         Torch object containing the layers and activations of the network.
+        After compile_for_inference it is compiled with TorchScript, or with
+        torch.compile, and after freeze_for_inference it is frozen.
     """
     def __init__(self, model_structure: dict, verbose=False):
         """
@@ -42,6 +93,7 @@ class NeuralNetworkModel(nn.Module):
         """
         super(NeuralNetworkModel, self).__init__()
         self.verbose = verbose
+        self._graph = None
         self.build_model_structure(model_structure)
 
     def build_model_structure(self, model_structure: dict):
@@ -69,22 +121,146 @@ class NeuralNetworkModel(nn.Module):
             model_structure = {}
         self.structure_consistency_check(model_structure)
         hidden_sizes = model_structure["hidden_sizes"]
-        input_layer = nn.Linear(model_structure["D_in"], hidden_sizes[0])
         activ_function = self._get_activation(model_structure["activation"])
+        if isinstance(activ_function, nn.ReLU):
+            # The ReLU is applied inside the fused layers. The activation slot
+            # is kept as an identity so that the layer indices, and therefore
+            # the keys of saved state dictionaries, do not change.
+            hidden_layer_type = FusedLinearReLU
+            make_activ = nn.Identity
+        else:
+            hidden_layer_type = nn.Linear
+            # Each layer gets its own activation instance instead of sharing
+            # the same one, so that every node is distinct when the model is
+            # scripted or traced.
+            make_activ = type(activ_function)
+        input_layer = hidden_layer_type(model_structure["D_in"],
+                                        hidden_sizes[0])
         output_layer = nn.Linear(hidden_sizes[-1], model_structure["D_out"])
-        modules = [input_layer, activ_function]
+        modules = [input_layer, make_activ()]
 
         hidden_layers = zip(hidden_sizes[:-1], hidden_sizes[1:])
         for h_1, h_2 in hidden_layers:
-            hidden_layer = nn.Linear(h_1, h_2)
+            hidden_layer = hidden_layer_type(h_1, h_2)
             modules.append(hidden_layer)
-            modules.append(activ_function)
+            modules.append(make_activ())
 
         modules.append(output_layer)
         self.raw_model = nn.Sequential(*modules)
         if self.verbose:
             print("Model built with the following modules: \n", modules)
 
+    def compile_for_inference(self, torch_compile=False, static_fusion=False):
+        """
+        Put the model in evaluation mode and compile its raw model for
+        inference, keeping its current weights. It should therefore be called
+        after the weights have been loaded and the model has been moved to
+        its device. The compiled model cannot be pickled, so it should not be
+        saved with torch.save; its state dictionary can still be saved.
+
+        Example
+        -------
+        >>> model = NeuralNetworkModel(d)
+        >>> model.load_state_dict(state_dict)
+        >>> model.compile_for_inference()
+
+        Parameters
+        ----------
+        torch_compile : bool, optional
+            Whether to compile the raw model with torch.compile instead of
+            TorchScript, by default False. The compilation happens on the
+            first forward pass and can take a while, but the generated kernels
+            are specialized for the static shapes of the network. It requires
+            a version of PyTorch that supports torch.compile; otherwise the
+            model is compiled with TorchScript.
+        static_fusion : bool, optional
+            Whether to make the TorchScript executor optimize the compiled
+            model once, for the first input shapes it sees, instead of
+            profiling the first runs and specializing the graph again when
+            the shapes change, by default False. The network is small and
+            evaluated many times in a row, so the profiling runs are a large
+            part of its cost. This sets the fusion strategy with
+            torch.jit.set_fusion_strategy, which applies to all the
+            TorchScript models of the process, not only to this one.
+        """
+        self.eval()
+        if static_fusion:
+            torch.jit.set_fusion_strategy([("STATIC", 1)])
+        if torch_compile and hasattr(self.raw_model, "compile"):
+            # Compiled in place, so the type of the raw model and the keys of
+            # its state dictionary do not change.
+            self.raw_model.compile(mode="reduce-overhead",
+                                   fullgraph=True,
+                                   dynamic=False)
+        else:
+            self.raw_model = self._script_raw_model()
+
+    def _script_raw_model(self) -> nn.Module:
+        """
+        Compile the raw model with TorchScript, so that the forward pass runs
+        as a single graph instead of dispatching each layer from Python.
+        Scripting is tried first. If it fails, the model is traced with a
+        dummy input of one point. If tracing fails as well, the eager model
+        is kept.
+        This method is called by compile_for_inference.
+
+        Returns
+        -------
+        nn.Module
+            The compiled raw model, or the eager raw model if it could not
+            be compiled.
+        """
+        try:
+            compiled_model = torch.jit.script(self.raw_model)
+        except Exception as error:
+            if self.verbose:
+                print(f"Scripting the model failed ({error}), tracing it.")
+            input_layer = self.raw_model[0]
+            try:
+                compiled_model = torch.jit.trace(
+                    self.raw_model,
+                    torch.zeros((1, input_layer.in_features),
+                                device=input_layer.weight.device,
+                                dtype=input_layer.weight.dtype))
+            except Exception as error:
+                if self.verbose:
+                    print(f"Tracing the model failed ({error}), "
+                          "keeping the eager model.")
+                return self.raw_model
+        return compiled_model
+
+    def freeze_for_inference(self):
+        """
+        Freeze the raw model compiled with TorchScript and optimize it for
+        inference. This folds the current weights into the graph as
+        constants and fuses the linear layers with their activations. If the
+        raw model has not been compiled with TorchScript yet, it is compiled
+        with compile_for_inference first.
+        The frozen model no longer has parameters: it cannot be trained, it
+        cannot load a state dictionary, and moving it to another device or
+        data type does not change the folded weights. This method should
+        therefore be the last step, after the weights have been loaded and
+        the model has been moved to its device.
+
+        Example
+        -------
+        >>> model = NeuralNetworkModel(d)
+        >>> model.load_state_dict(state_dict)
+        >>> model.freeze_for_inference()
+
+        Raises
+        ------
+        AssertionError
+            If the raw model could not be compiled with TorchScript.
+        """
+        if not isinstance(self.raw_model, torch.jit.ScriptModule):
+            self.compile_for_inference()
+        assert isinstance(self.raw_model, torch.jit.ScriptModule), (
+            "Only models compiled with TorchScript can be frozen.")
+        self.eval()
+        self.raw_model = torch.jit.optimize_for_inference(
+            torch.jit.freeze(self.raw_model.eval()))
+
     def forward(self, x: torch.Tensor) -> torch.Tensor:
         """
         Do a forward pass through the raw neural network model simulating the
@@ -106,6 +282,110 @@ class NeuralNetworkModel(nn.Module):
         """
         return self.raw_model(x)
 
+    def quantize(self):
+        """
+        Quantize the weights of the linear layers of the raw model to int8,
+        with dynamic quantization of the activations. This reduces the memory
+        traffic of the forward pass and enables int8 matrix multiplications
+        on CPUs that support them. The quantized model only runs on the CPU,
+        it cannot be trained, and its state dictionary holds packed weights
+        instead of the original parameters, so this method should be called
+        after the weights have been loaded.
+        Fused linear and ReLU layers are split into a linear layer and a ReLU
+        activation first, so that they are quantized as well.
+
+        Example
+        -------
+        >>> model = NeuralNetworkModel(d)
+        >>> model.load_state_dict(state_dict)
+        >>> model.quantize()
+
+        Raises
+        ------
+        AssertionError
+            If the raw model has been compiled.
+        """
+        assert isinstance(self.raw_model, nn.Sequential), (
+            "Only models that have not been compiled can be quantized.")
+        for i, module in enumerate(self.raw_model):
+            if isinstance(module, FusedLinearReLU):
+                linear_layer = nn.Linear(module.in_features,
+                                         module.out_features)
+                linear_layer.load_state_dict(module.state_dict())
+                self.raw_model[i] = linear_layer
+                self.raw_model[i + 1] = nn.ReLU()
+        self.raw_model = torch.ao.quantization.quantize_dynamic(
+            self.raw_model, {nn.Linear}, dtype=torch.qint8)
+
+    def capture_graph(self, sample_input: torch.Tensor, warmup_steps=3):
+        """
+        Capture the forward pass of the raw model in a CUDA graph, so that it
+        can be replayed with forward_graph without launching each kernel from
+        Python. The graph is captured for the shape, data type and device of
+        the sample input, and it is captured without gradient tracking.
+        The model is run a few times on a side stream before capturing, as
+        required by CUDA graphs. The graph keeps using the parameter storages
+        it was captured with, so it has to be captured again after the model
+        is moved or cast, e.g. with .to() or .double().
+
+        Example
+        -------
+        >>> model = NeuralNetworkModel(d)
+        >>> model.capture_graph(torch.zeros(100, 7, device="cuda"))
+        >>> model.forward_graph(torch.rand(100, 7, device="cuda"))
+
+        Parameters
+        ----------
+        sample_input : torch.Tensor
+            Input data with the shape that will be used in forward_graph.
+            It needs to be on a CUDA device.
+        warmup_steps : int, optional
+            Number of forward passes run before capturing, by default 3.
+
+        Raises
+        ------
+        AssertionError
+            If the sample input is not on a CUDA device.
+        """
+        assert sample_input.device.type == "cuda", (
+            "CUDA graphs can only be captured for inputs on a CUDA device.")
+        self._static_input = sample_input.clone()
+        stream = torch.cuda.Stream()
+        stream.wait_stream(torch.cuda.current_stream())
+        with torch.no_grad(), torch.cuda.stream(stream):
+            for _ in range(warmup_steps):
+                self.raw_model(self._static_input)
+        torch.cuda.current_stream().wait_stream(stream)
+        self._graph = torch.cuda.CUDAGraph()
+        with torch.no_grad(), torch.cuda.graph(self._graph):
+            self._static_output = self.raw_model(self._static_input)
+
+    def forward_graph(self, x: torch.Tensor) -> torch.Tensor:
+        """
+        Do a forward pass by replaying the CUDA graph captured with
+        capture_graph. If no graph has been captured, or the input is not on
+        a CUDA device or does not have the captured shape, a regular forward
+        pass is done instead. The output of the replayed graph does not track
+        gradients, so this method is meant for inference only.
+
+        Parameters
+        ----------
+        x : torch.Tensor
+            Input data.
+
+        Returns
+        -------
+        torch.Tensor
+            Output data.
+        """
+        if self._graph is None or x.device.type != "cuda":
+            return self.forward(x)
+        if x.shape != self._static_input.shape:
+            return self.forward(x)
+        self._static_input.copy_(x)
+        self._graph.replay()
+        return self._static_output.clone()
+
     def _get_activation(self, activation: str):
         """
         Get the activation of the model. If it's a string then return an
@@ -129,21 +409,12 @@ class NeuralNetworkModel(nn.Module):
         UserWarning
             If activation string is not recognized.
         """
-        if activation == "relu":
-            return nn.ReLU()
-        elif activation == "elu":
-            return nn.ELU()
-        elif activation == "tanh":
-            return nn.Tanh()
-        elif activation == "hard-tanh":
-            return nn.Hardtanh()
-        elif activation == "sigmoid":
-            return nn.Sigmoid()
-        else:
-            warnings.warn("Activation not recognized, applying ReLU")
-            return nn.ReLU()
-        if self.verbose:
-            print(f"Activation function is set as {activation}")
+        if isinstance(activation, str) and activation in _ACTIVATIONS:
+            if self.verbose:
+                print(f"Activation function is set as {activation}")
+            return _ACTIVATIONS[activation]()
+        warnings.warn("Activation not recognized, applying ReLU")
+        return nn.ReLU()
 
     def structure_consistency_check(self, model_structure: dict):
         """
@@ -161,51 +432,15 @@ class NeuralNetworkModel(nn.Module):
         UserWarning
             If a parameter is not in the expected format.
         """
-        default_in_size = 7
-        default_out_size = 1
-        default_hidden_size = 90
-        default_hidden_number = 6
-        default_activation = "relu"
-        if not ("activation" in model_structure):
-            model_structure["activation"] = "relu"
-            warnings.warn(
-                "The model loaded does not define the activation as "
-                f"expected. Changed it to default value: {default_activation}."
-            )
-        if "D_in" not in model_structure:
-            # Check input dimension.
-            model_structure["D_in"] = default_in_size
-            warnings.warn(
-                "The model loaded does not define the input dimension as "
-                f"expected. Changed it to default value: {default_in_size}.")
-        else:
-            D_in = model_structure.get('D_in')
-            assert (type(D_in) == int)
-            if D_in < 0:
-                raise AssertionError("D_in cannot be negative")
-
-        if "D_out" not in model_structure:
-            # Check output dimension.
-            model_structure["D_out"] = default_out_size
-            warnings.warn(
-                "The model loaded does not define the output dimension as "
-                f"expected. Changed it to default value: {default_out_size}.")
-        else:
-            D_out = model_structure.get('D_out')
-            assert (type(D_out) == int)
-            if D_out < 0:
-                raise AssertionError("D_in cannot be negative")
-
-        if "hidden_sizes" not in model_structure:
-            # Check sizes of hidden layers.
-            model_structure["hidden_sizes"] = [default_hidden_size
-                                               ] * default_hidden_number
-            warnings.warn(
-                "The model loaded does not define the hidden layer sizes as "
-                f"expected. Changed it to default value: "
-                f"{default_hidden_number} layers of {default_hidden_size}.")
-        else:
-            hidden_sizes = model_structure.get('hidden_sizes')
-            assert (type(hidden_sizes) == list)
-            for i in hidden_sizes:
-                assert (type(i) == int)
+        for key, default, message in _DEFAULT_STRUCTURE:
+            if key not in model_structure:
+                model_structure[key] = copy.copy(default)
+                warnings.warn(message)
+        for key in ("D_in", "D_out"):
+            assert (type(model_structure[key]) == int)
+            if model_structure[key] < 0:
+                raise AssertionError(f"{key} cannot be negative")
+        hidden_sizes = model_structure["hidden_sizes"]
+        assert (type(hidden_sizes) == list)
+        for i in hidden_sizes:
+            assert (type(i) == int)
@@ -16,7 +16,9 @@ requires = [
     "yapf==0.31.0",
     # Packages for testing
     "unittest2",
-    "html-testRunner",
+    "pytest",
+    "pytest-xdist",
+    "pytest-html",
 ]
 
 assert (
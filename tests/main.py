@@ -1,20 +1,27 @@
 """
 Module for running all tests on brainspy.
+The tests are run with pytest, distributed over all the available CPU cores
+with pytest-xdist. Each test module is kept on a single worker, so that torch
+tensors and processors are not shared between processes. An html report is
+written to tmp/test-reports.
 """
 
-import unittest
+import sys
+import subprocess
 import brainspy
 
 if __name__ == "__main__":
-    from HtmlTestRunner import HTMLTestRunner
     from datetime import datetime
 
     timestamp = datetime.today().strftime('%d-%m-%Y-%H:%M:%S')
 
-    brainspy.TEST_MODE = 'SIMULATION_PC'  # Available test modes: SIMULATION_PC, HARDWARE_CDAQ, HARDWARE_NIDAQ
-    modules_to_test = unittest.defaultTestLoader.discover(start_dir="tests/",
-                                                          pattern="*.py",
-                                                          top_level_dir=None)
-    HTMLTestRunner(output="tmp/test-reports/" +
-                   str(timestamp)).run(modules_to_test)
+    # The test mode is read by every worker from brainspy/__init__.py.
+    # Available test modes: SIMULATION_PC, HARDWARE_CDAQ, HARDWARE_NIDAQ
     print(brainspy.TEST_MODE)
+    result = subprocess.run([
+        sys.executable, "-m", "pytest", "tests/", "-o", "python_files=*.py",
+        "-n", "auto", "--dist=loadfile",
+        "--html=tmp/test-reports/" + str(timestamp) + ".html",
+        "--self-contained-html"
+    ])
+    sys.exit(result.returncode)
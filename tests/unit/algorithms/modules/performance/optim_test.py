@@ -1,5 +1,4 @@
 import unittest
-import random
 import torch
 import numpy as np
 from brainspy.algorithms.modules.optim import GeneticOptimizer
@@ -12,16 +11,38 @@ class OptimTest(unittest.TestCase):
     """
     Testing the optim.py file - GeneticOptimizer class.
     """
+    @classmethod
+    def setUpClass(cls):
+        """
+        Create the constructor arguments and random values shared by the
+        tests, and an optimizer for the tests that do not change its state.
+        """
+        cls._gene_ranges = torch.tensor([[-1.2, 0.6], [-1.2, 0.6]])
+        cls._partition = [torch.tensor(4), torch.tensor(22)]
+        cls._optim = cls._create_optimizer()
+        # Random values used by the tests, drawn at once from a seeded
+        # generator so that the tests are reproducible.
+        generator = torch.Generator().manual_seed(0)
+        cls._rand_ints = torch.randint(-1000, 1001, (32, ),
+                                       generator=generator)
+        cls._rand_uniforms = torch.rand((32, 2), generator=generator)
+
+    @classmethod
+    def _create_optimizer(cls):
+        """
+        Create a new optimizer from the shared constructor arguments, for the
+        tests that change its state.
+        """
+        return GeneticOptimizer(gene_ranges=cls._gene_ranges,
+                                partition=cls._partition,
+                                epochs=100)
 
     def test_init(self):
         """
         Test to initialize the Genetic Optimizer
         """
         try:
-            optim = GeneticOptimizer(
-                gene_ranges=torch.tensor([[-1.2, 0.6], [-1.2, 0.6]]),
-                partition=[torch.tensor(4), torch.tensor(22)],
-                epochs=100)
+            optim = self._optim
 
             self.assertEqual(optim.epochs, 100)
             self.assertEqual(optim.epoch, 0)
@@ -45,8 +66,7 @@ class OptimTest(unittest.TestCase):
         with self.assertRaises(ValueError):
             GeneticOptimizer(gene_ranges=torch.tensor([[1.2, 0.6], [1.2,
                                                                     0.6]]),
-                             partition=[torch.tensor(4),
-                                        torch.tensor(22)],
+                             partition=self._partition,
                              epochs=100)
 
     def test_init_invalid_shape(self):
@@ -55,8 +75,7 @@ class OptimTest(unittest.TestCase):
         """
         with self.assertRaises(IndexError):
             GeneticOptimizer(gene_ranges=torch.tensor([[1.2], [0.6]]),
-                             partition=[torch.tensor(4),
-                                        torch.tensor(22)],
+                             partition=self._partition,
                              epochs=100)
 
     def test_init_invalid_type(self):
@@ -65,8 +84,7 @@ class OptimTest(unittest.TestCase):
         """
         with self.assertRaises(IndexError):
             GeneticOptimizer(gene_ranges=[-1.2, 0.6],
-                             partition=[torch.tensor(4),
-                                        torch.tensor(22)],
+                             partition=self._partition,
                              epochs=100)
 
     def test_init_invalid_none(self):
@@ -75,8 +93,7 @@ class OptimTest(unittest.TestCase):
         """
         with self.assertRaises(TypeError):
             GeneticOptimizer(gene_ranges=None,
-                             partition=[torch.tensor(4),
-                                        torch.tensor(22)],
+                             partition=self._partition,
                              epochs=100)
 
     def test_init_invalid_negative_dim(self):
@@ -85,8 +102,7 @@ class OptimTest(unittest.TestCase):
         - Trying to create tensor with negative dimension -11: [-11, 2]
         """
         with self.assertRaises(RuntimeError):
-            GeneticOptimizer(gene_ranges=torch.tensor([[-1.2, 0.6],
-                                                       [-1.2, 0.6]]),
+            GeneticOptimizer(gene_ranges=self._gene_ranges,
                              partition=[torch.tensor(-11)],
                              epochs=100)
 
@@ -95,20 +111,17 @@ class OptimTest(unittest.TestCase):
         Invalid type for partition raises an AssertionError
         """
         with self.assertRaises(AssertionError):
-            GeneticOptimizer(gene_ranges=torch.tensor([[-1.2, 0.6],
-                                                       [-1.2, 0.6]]),
+            GeneticOptimizer(gene_ranges=self._gene_ranges,
                              partition=np.array([1, 2, 3, 4]),
                              epochs=100)
 
         with self.assertRaises(AssertionError):
-            GeneticOptimizer(gene_ranges=torch.tensor([[-1.2, 0.6],
-                                                       [-1.2, 0.6]]),
+            GeneticOptimizer(gene_ranges=self._gene_ranges,
                              partition=None,
                              epochs=100)
 
         with self.assertRaises(AssertionError):
-            GeneticOptimizer(gene_ranges=torch.tensor([[-1.2, 0.6],
-                                                       [-1.2, 0.6]]),
+            GeneticOptimizer(gene_ranges=self._gene_ranges,
                              partition="string type",
                              epochs=100)
 
@@ -117,24 +130,18 @@ class OptimTest(unittest.TestCase):
         Invalid type for epochs raises an AssertionError
         """
         with self.assertRaises(AssertionError):
-            GeneticOptimizer(gene_ranges=torch.tensor([[-1.2, 0.6],
-                                                       [-1.2, 0.6]]),
-                             partition=[torch.tensor(4),
-                                        torch.tensor(22)],
+            GeneticOptimizer(gene_ranges=self._gene_ranges,
+                             partition=self._partition,
                              epochs=[1, 2, 3, 4])
 
         with self.assertRaises(AssertionError):
-            GeneticOptimizer(gene_ranges=torch.tensor([[-1.2, 0.6],
-                                                       [-1.2, 0.6]]),
-                             partition=[torch.tensor(4),
-                                        torch.tensor(22)],
+            GeneticOptimizer(gene_ranges=self._gene_ranges,
+                             partition=self._partition,
                              epochs="invalid type")
 
         with self.assertRaises(AssertionError):
-            GeneticOptimizer(gene_ranges=torch.tensor([[-1.2, 0.6],
-                                                       [-1.2, 0.6]]),
-                             partition=[torch.tensor(4),
-                                        torch.tensor(22)],
+            GeneticOptimizer(gene_ranges=self._gene_ranges,
+                             partition=self._partition,
                              epochs=np.array([1, 2, 3, 4]))
 
     def test_step(self):
@@ -142,14 +149,10 @@ class OptimTest(unittest.TestCase):
         Testing the step function with a random torch tensor for a
         criterion pool and checking if epoch increments
         """
-        optim = GeneticOptimizer(gene_ranges=torch.tensor([[-1.2, 0.6],
-                                                           [-1.2, 0.6]]),
-                                 partition=[torch.tensor(4),
-                                            torch.tensor(22)],
-                                 epochs=100)
+        optim = self._create_optimizer()
         try:
             optim.step(
-                criterion_pool=torch.tensor(random.randint(-1000, 1000)))
+                criterion_pool=self._rand_ints[0])
         except (Exception):
             self.fail("Could'nt perform step")
         self.assertEqual(optim.epoch, 101)
@@ -159,21 +162,14 @@ class OptimTest(unittest.TestCase):
         ValueError: step must be greater than zero
         """
         with self.assertRaises(ValueError):
-            optim = GeneticOptimizer(
-                gene_ranges=torch.tensor([[-1.2, 0.6], [-1.2, 0.6]]),
-                partition=[torch.tensor(4), torch.tensor(22)],
-                epochs=100)
+            optim = self._create_optimizer()
             optim.step(criterion_pool=torch.tensor([1, 2, 3, 4]))
 
     def test_step_fail(self):
         """
         Invalid type for step argument raises an AssertionError
         """
-        optim = GeneticOptimizer(gene_ranges=torch.tensor([[-1.2, 0.6],
-                                                           [-1.2, 0.6]]),
-                                 partition=[torch.tensor(4),
-                                            torch.tensor(22)],
-                                 epochs=100)
+        optim = self._optim
         with self.assertRaises(AssertionError):
             optim.step(None)
         with self.assertRaises(AssertionError):
@@ -187,11 +183,7 @@ class OptimTest(unittest.TestCase):
         """
         Test to generate a random pool
         """
-        optim = GeneticOptimizer(gene_ranges=torch.tensor([[-1.2, 0.6],
-                                                           [-1.2, 0.6]]),
-                                 partition=[torch.tensor(4),
-                                            torch.tensor(22)],
-                                 epochs=100)
+        optim = self._optim
         try:
             optim._init_pool()
         except (Exception):
@@ -201,17 +193,11 @@ class OptimTest(unittest.TestCase):
         """
         Testing the crossover ethod with random values for 2 parent parameters
         """
-        optim = GeneticOptimizer(gene_ranges=torch.tensor([[-1.2, 0.6],
-                                                           [-1.2, 0.6]]),
-                                 partition=[torch.tensor(4),
-                                            torch.tensor(22)],
-                                 epochs=100)
+        optim = self._create_optimizer()
 
         try:
-            optim.step(torch.tensor(random.randint(-1000, 1000)))
-            new_pool = optim.crossover(new_pool=torch.tensor(
-                [random.uniform(0, 1),
-                 random.uniform(0, 1)]))
+            optim.step(self._rand_ints[1])
+            new_pool = optim.crossover(new_pool=self._rand_uniforms[0])
 
         except (Exception):
             self.fail("Could not generate random pool")
@@ -221,11 +207,7 @@ class OptimTest(unittest.TestCase):
         """
         Invalid type for the crossover method raises an AssertionError
         """
-        optim = GeneticOptimizer(gene_ranges=torch.tensor([[-1.2, 0.6],
-                                                           [-1.2, 0.6]]),
-                                 partition=[torch.tensor(4),
-                                            torch.tensor(22)],
-                                 epochs=100)
+        optim = self._optim
         with self.assertRaises(AssertionError):
             optim.crossover("String type")
         with self.assertRaises(AssertionError):
@@ -239,12 +221,8 @@ class OptimTest(unittest.TestCase):
         """
         Test for Universal sampling after an initial step
         """
-        optim = GeneticOptimizer(gene_ranges=torch.tensor([[-1.2, 0.6],
-                                                           [-1.2, 0.6]]),
-                                 partition=[torch.tensor(4),
-                                            torch.tensor(22)],
-                                 epochs=100)
-        optim.step(torch.tensor(random.randint(-1000, 1000)))
+        optim = self._create_optimizer()
+        optim.step(self._rand_ints[2])
         try:
             chosen = optim.universal_sampling()
         except (Exception):
@@ -255,12 +233,8 @@ class OptimTest(unittest.TestCase):
         """
         Test for linear ranking after an initial step
         """
-        optim = GeneticOptimizer(gene_ranges=torch.tensor([[-1.2, 0.6],
-                                                           [-1.2, 0.6]]),
-                                 partition=[torch.tensor(4),
-                                            torch.tensor(22)],
-                                 epochs=100)
-        optim.step(torch.tensor(random.randint(-1000, 1000)))
+        optim = self._create_optimizer()
+        optim.step(self._rand_ints[3])
         try:
             optim.linear_rank()
         except (Exception):
@@ -271,11 +245,7 @@ class OptimTest(unittest.TestCase):
         Test for the crossover_blxab() method with 2 random values for
         parents
         """
-        optim = GeneticOptimizer(gene_ranges=torch.tensor([[-1.2, 0.6],
-                                                           [-1.2, 0.6]]),
-                                 partition=[torch.tensor(4),
-                                            torch.tensor(22)],
-                                 epochs=100)
+        optim = self._optim
         try:
             offspring = optim.crossover_blxab(torch.rand(10), torch.rand(10))
             assert isinstance(offspring, torch.Tensor)
@@ -286,11 +256,7 @@ class OptimTest(unittest.TestCase):
         """
         Invalid type for crossover_blxab() raises an AssertionError
         """
-        optim = GeneticOptimizer(gene_ranges=torch.tensor([[-1.2, 0.6],
-                                                           [-1.2, 0.6]]),
-                                 partition=[torch.tensor(4),
-                                            torch.tensor(22)],
-                                 epochs=100)
+        optim = self._optim
         with self.assertRaises(AssertionError):
             optim.crossover_blxab("torch.rand(10)", torch.rand(10))
         with self.assertRaises(AssertionError):
@@ -304,11 +270,7 @@ class OptimTest(unittest.TestCase):
         """
         Test for update_mutation_rate() method
         """
-        optim = GeneticOptimizer(gene_ranges=torch.tensor([[-1.2, 0.6],
-                                                           [-1.2, 0.6]]),
-                                 partition=[torch.tensor(4),
-                                            torch.tensor(22)],
-                                 epochs=100)
+        optim = self._optim
         try:
             optim.update_mutation_rate()
         except (Exception):
@@ -318,16 +280,10 @@ class OptimTest(unittest.TestCase):
         """
         Test for a mutation with a pool after an initial step and crossover
         """
-        optim = GeneticOptimizer(gene_ranges=torch.tensor([[-1.2, 0.6],
-                                                           [-1.2, 0.6]]),
-                                 partition=[torch.tensor(4),
-                                            torch.tensor(22)],
-                                 epochs=100)
+        optim = self._create_optimizer()
         try:
-            optim.step(torch.tensor(random.randint(-1000, 1000)))
-            new_pool = optim.crossover(new_pool=torch.tensor(
-                [random.uniform(0, 1),
-                 random.uniform(0, 1)]))
+            optim.step(self._rand_ints[4])
+            new_pool = optim.crossover(new_pool=self._rand_uniforms[1])
             optim.mutation(new_pool)
         except (Exception):
             self.fail("Could not update mutataion rate")
@@ -336,11 +292,7 @@ class OptimTest(unittest.TestCase):
         """
         Invalid type for muttation raises an AssertionError
         """
-        optim = GeneticOptimizer(gene_ranges=torch.tensor([[-1.2, 0.6],
-                                                           [-1.2, 0.6]]),
-                                 partition=[torch.tensor(4),
-                                            torch.tensor(22)],
-                                 epochs=100)
+        optim = self._optim
         with self.assertRaises(AssertionError):
             optim.mutation("pool")
         with self.assertRaises(AssertionError):
@@ -354,16 +306,10 @@ class OptimTest(unittest.TestCase):
         """
         Test to remove duplicates after a step and crossover
         """
-        optim = GeneticOptimizer(gene_ranges=torch.tensor([[-1.2, 0.6],
-                                                           [-1.2, 0.6]]),
-                                 partition=[torch.tensor(4),
-                                            torch.tensor(22)],
-                                 epochs=100)
+        optim = self._create_optimizer()
         try:
-            optim.step(torch.tensor(random.randint(-1000, 1000)))
-            new_pool = optim.crossover(new_pool=torch.tensor(
-                [random.uniform(0, 1),
-                 random.uniform(0, 1)]))
+            optim.step(self._rand_ints[5])
+            new_pool = optim.crossover(new_pool=self._rand_uniforms[2])
             edited = optim.remove_duplicates(new_pool)
         except (Exception):
             self.fail("Could not update mutataion rate")
@@ -373,11 +319,7 @@ class OptimTest(unittest.TestCase):
         """
         Invalid type for remove_duplicates raises an AssertionError
         """
-        optim = GeneticOptimizer(gene_ranges=torch.tensor([[-1.2, 0.6],
-                                                           [-1.2, 0.6]]),
-                                 partition=[torch.tensor(4),
-                                            torch.tensor(22)],
-                                 epochs=100)
+        optim = self._optim
         with self.assertRaises(AssertionError):
             optim.remove_duplicates("pool")
         with self.assertRaises(AssertionError):
@@ -0,0 +1,122 @@
+"""
+Configs and fixtures shared by the tests of 'processor.py'.
+"""
+
+import torch
+
+from brainspy.utils.pytorch import TorchUtils
+from brainspy.processors.processor import Processor
+
+# Processor settings shared by the processor tests. The simulation
+# processors do not write into these dicts. Assume 7 activation electrodes
+# and 1 output electrode.
+
+# define electrode effects
+CLIPPING = [-114.0, 114.0]
+AMPLIFICATION = [28.5]
+VOLTAGES = [[-1.2, 0.6], [-1.2, 0.6], [-1.2, 0.6], [-1.2, 0.6], [-1.2, 0.6],
+            [-0.7, 0.3], [-0.7, 0.3]]
+
+# create electrode dictionaries
+ELECTRODE_EFFECTS = {
+    "amplification": AMPLIFICATION,
+    "output_clipping": CLIPPING,
+    "voltage_ranges": VOLTAGES,
+    "noise": None
+}
+ELECTRODE_INFO = {
+    'activation_electrodes': {
+        'electrode_no': 7,
+        'voltage_ranges': VOLTAGES
+    },
+    'output_electrodes': {
+        'electrode_no': 1,
+        'amplification': AMPLIFICATION,
+        'clipping_value': CLIPPING
+    }
+}
+
+# define waveforms
+PLATEAU = 80
+WAVEFORM = {"slope_length": 20, "plateau_length": PLATEAU}
+
+# create config dictionaries
+CONFIGS_SIMULATION = {
+    "processor_type": "simulation",
+    "electrode_effects": ELECTRODE_EFFECTS,
+    "waveform": WAVEFORM,
+    "driver": {}
+}
+CONFIGS_DEBUG = {
+    "processor_type": "simulation_debug",
+    "electrode_effects": ELECTRODE_EFFECTS,
+    "waveform": WAVEFORM,
+    "driver": {}
+}
+
+# create model and info
+MODEL_STRUCTURE = {
+    "D_in": 7,
+    "D_out": 1,
+    "activation": "relu",
+    "hidden_sizes": [20, 20, 20]
+}
+INFO = {"model_structure": MODEL_STRUCTURE, "electrode_info": ELECTRODE_INFO}
+
+
+class ProcessorFixtures:
+    """
+    Mixin with the configs used for testing 'processor.py', to be combined
+    with unittest.TestCase. It has no tests of its own.
+    """
+    @classmethod
+    def setUpClass(cls):
+        """
+        Set the configs to create different processors with, and the tensors
+        used to check them.
+        """
+        super().setUpClass()
+        cls.plateau = PLATEAU
+        cls.configs_simulation = CONFIGS_SIMULATION
+        cls.configs_debug = CONFIGS_DEBUG
+        cls.info = INFO
+
+        # number of input points used to check the plateau output shapes,
+        # and one input buffer that is sliced for each of them
+        cls.sizes = (1, 50, 99)
+        cls._inputs = torch.empty((max(cls.sizes), 7),
+                                  device=TorchUtils.get_device(),
+                                  dtype=torch.get_default_dtype())
+
+        # targets to compare the voltage ranges and clipping values with
+        cls._voltage_target = TorchUtils.format(VOLTAGES)
+        cls._clipping_target = TorchUtils.format(CLIPPING)
+
+    @classmethod
+    def _create_processors(cls):
+        """
+        Create a simulation and a simulation debug processor.
+
+        Returns
+        -------
+        tuple
+            The simulation processor and the simulation debug processor.
+        """
+        return (Processor(cls.configs_simulation, cls.info),
+                Processor(cls.configs_debug, cls.info))
+
+    def _assert_voltage_ranges(self, processor):
+        """
+        Compare the voltage ranges of the processor to the list used to
+        create it.
+        """
+        self.assertEqual(processor.get_voltage_ranges().tolist(),
+                         self._voltage_target.tolist())
+
+    def _assert_clipping_value(self, processor):
+        """
+        Compare the clipping value of the processor to the list used to
+        create it.
+        """
+        self.assertEqual(processor.get_clipping_value().tolist(),
+                         self._clipping_target.tolist())
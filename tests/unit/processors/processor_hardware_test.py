@@ -0,0 +1,244 @@
+"""
+Module for testing 'processor.py' with hardware processors. The whole module
+is skipped unless the tests run on a cdaq to cdaq or cdaq to nidaq setup.
+"""
+
+import copy
+import unittest
+
+import torch
+
+import brainspy
+from brainspy.processors.processor import Processor
+from tests.unit.processors._fixtures import (ProcessorFixtures, AMPLIFICATION,
+                                             CLIPPING, VOLTAGES, WAVEFORM)
+
+
+# define hardware configs; load_processor and the drivers write into the
+# configs they get, so the tests only pass copies of these dicts
+INSTRUMENTS_SETUP_CDAQ = {
+    "activation_instrument": "cDAQ1Mod4",
+    "activation_sampling_frequency": 10000,
+    "activation_channels": [8, 10, 13, 11, 7, 12, 14],
+    "activation_voltage_ranges": VOLTAGES,
+    "readout_instrument": "cDAQ1Mod3",
+    "readout_sampling_frequency": 10000,
+    "readout_channels": [2],
+    "trigger_source": "cDAQ1/segment1"
+}
+DRIVER_CDAQ = {
+    "instruments_setup": INSTRUMENTS_SETUP_CDAQ,
+    "output_clipping_range": CLIPPING,
+    "amplification": AMPLIFICATION[0]
+}
+CONFIGS_CDAQ = {
+    "processor_type": "cdaq_to_cdaq",
+    "electrode_effects": {},
+    "waveform": WAVEFORM,
+    "driver": DRIVER_CDAQ
+}
+INSTRUMENTS_SETUP_NIDAQ = {
+    "activation_instrument": "dev1",
+    "activation_sampling_frequency": 10000,
+    "activation_channels": [0, 1, 2, 3, 4, 5, 6],
+    "readout_instrument": "cDAQ1Mod1",
+    "readout_sampling_frequency": 10000,
+    "readout_channels": [0]
+}
+DRIVER_NIDAQ = {
+    "instruments_setup": INSTRUMENTS_SETUP_NIDAQ,
+    "output_clipping_range": CLIPPING,
+    "amplification": AMPLIFICATION[0]
+}
+CONFIGS_NIDAQ = {
+    "processor_type": "cdaq_to_nidaq",
+    "electrode_effects": {},
+    "waveform": WAVEFORM,
+    "driver": DRIVER_NIDAQ
+}
+
+
+@unittest.skipIf(brainspy.TEST_MODE not in ("HARDWARE_CDAQ", "HARDWARE_NIDAQ"),
+                 "Hardware tests are skipped for simulation setup.")
+class ProcessorHardwareTest(ProcessorFixtures, unittest.TestCase):
+    """
+    Class for testing 'processor.py' with hardware processors.
+    """
+    @classmethod
+    def setUpClass(cls):
+        """
+        Set the configs for the cdaq to cdaq and cdaq to nidaq processors.
+        The processors themselves are created by each test.
+        """
+        super().setUpClass()
+        cls.configs_cdaq = CONFIGS_CDAQ
+        cls.configs_nidaq = CONFIGS_NIDAQ
+
+    def _run_hw_case(self, configs, assertion_fn=None):
+        """
+        Create a hardware processor, run a check on it and close it, also
+        when the check fails. The processor gets a copy of the configs, as
+        load_processor and the drivers write into the configs they receive.
+
+        Parameters
+        ----------
+        configs : dict
+            Configs of the hardware processor.
+        assertion_fn : callable, optional
+            Function that receives the processor and runs the assertions
+            on it, by default None; then only creation and closing are
+            tested.
+        """
+        processor = Processor(copy.deepcopy(configs), self.info)
+        try:
+            if assertion_fn is not None:
+                assertion_fn(processor)
+        finally:
+            processor.close()
+
+    def _assert_forward(self, processor):
+        """
+        Run forward pass and check shape of result. Takes into account the
+        plateau length.
+        """
+        with torch.inference_mode():
+            for i in self.sizes:
+                x = self._inputs[:i]
+                x = processor.forward(x)
+                self.assertEqual(list(x.shape), [self.plateau * i, 1])
+
+    @unittest.skipIf(brainspy.TEST_MODE != "HARDWARE_CDAQ",
+                     "Hardware test is skipped for simulation setup.")
+    def test_cdaq(self):
+        """
+        Test the creation of the cdaq to cdaq processor type.
+        Also tests load_configs() and close().
+        """
+        self._run_hw_case(self.configs_cdaq)
+
+    @unittest.skipIf(brainspy.TEST_MODE != "HARDWARE_NIDAQ",
+                     "Hardware test is skipped for simulation setup.")
+    def test_nidaq(self):
+        """
+        Test the creation of the cdaq to nidaq processor type.
+        Also tests load_configs() and close().
+        """
+        self._run_hw_case(self.configs_nidaq)
+
+    @unittest.skipIf(brainspy.TEST_MODE != "HARDWARE_CDAQ",
+                     "Hardware test is skipped for simulation setup.")
+    def test_forward_cdaq(self):
+        """
+        Test the forward pass of the cdaq to cdaq processor.
+        """
+        self._run_hw_case(self.configs_cdaq, self._assert_forward)
+
+    @unittest.skipIf(brainspy.TEST_MODE != "HARDWARE_NIDAQ",
+                     "Hardware test is skipped for simulation setup.")
+    def test_forward_nidaq(self):
+        """
+        Test the forward pass of the cdaq to nidaq processor.
+        """
+        self._run_hw_case(self.configs_nidaq, self._assert_forward)
+
+    @unittest.skipIf(brainspy.TEST_MODE != "HARDWARE_CDAQ",
+                     "Hardware test is skipped for simulation setup.")
+    def test_get_voltage_ranges_cdaq(self):
+        """
+        Test the method for getting the voltage ranges. Compare to the list
+        used to create the processor.
+        For cdaq to cdaq.
+        """
+        self._run_hw_case(self.configs_cdaq, self._assert_voltage_ranges)
+
+    @unittest.skipIf(brainspy.TEST_MODE != "HARDWARE_NIDAQ",
+                     "Hardware test is skipped for simulation setup.")
+    def test_get_voltage_ranges_nidaq(self):
+        """
+        Test the method for getting the voltage ranges. Compare to the list
+        used to create the processor.
+        For cdaq to nidaq.
+        """
+        self._run_hw_case(self.configs_nidaq, self._assert_voltage_ranges)
+
+    @unittest.skipIf(brainspy.TEST_MODE != "HARDWARE_CDAQ",
+                     "Hardware test is skipped for simulation setup.")
+    def test_get_activation_electrode_no_cdaq(self):
+        """
+        Test the method for getting the number of activation electrodes,
+        should be 7.
+        For cdaq to cdaq.
+        """
+        self._run_hw_case(
+            self.configs_cdaq,
+            lambda p: self.assertEqual(p.get_activation_electrode_no(), 7))
+
+    @unittest.skipIf(brainspy.TEST_MODE != "HARDWARE_NIDAQ",
+                     "Hardware test is skipped for simulation setup.")
+    def test_get_activation_electrode_no_nidaq(self):
+        """
+        Test the method for getting the number of activation electrodes,
+        should be 7.
+        For cdaq to nidaq.
+        """
+        self._run_hw_case(
+            self.configs_nidaq,
+            lambda p: self.assertEqual(p.get_activation_electrode_no(), 7))
+
+    @unittest.skipIf(brainspy.TEST_MODE != "HARDWARE_CDAQ",
+                     "Hardware test is skipped for simulation setup.")
+    def test_get_clipping_value_cdaq(self):
+        """
+        Test the method for getting the clipping value for cdaq to cdaq.
+        """
+        self._run_hw_case(self.configs_cdaq, self._assert_clipping_value)
+
+    @unittest.skipIf(brainspy.TEST_MODE != "HARDWARE_NIDAQ",
+                     "Hardware test is skipped for simulation setup.")
+    def test_get_clipping_value_nidaq(self):
+        """
+        Test the method for getting the clipping value for cdaq to nidaq.
+        """
+        self._run_hw_case(self.configs_nidaq, self._assert_clipping_value)
+
+    @unittest.skipIf(brainspy.TEST_MODE != "HARDWARE_CDAQ",
+                     "Hardware test is skipped for simulation setup.")
+    def test_swap_cdaq(self):
+        """
+        Test swap method for cdaq to cdaq.
+        """
+        self._run_hw_case(self.configs_cdaq,
+                          lambda p: p.swap(copy.deepcopy(self.configs_cdaq),
+                                           self.info))
+
+    @unittest.skipIf(brainspy.TEST_MODE != "HARDWARE_NIDAQ",
+                     "Hardware test is skipped for simulation setup.")
+    def test_swap_nidaq(self):
+        """
+        Test swap method for cdaq to nidaq.
+        """
+        self._run_hw_case(self.configs_nidaq,
+                          lambda p: p.swap(copy.deepcopy(self.configs_nidaq),
+                                           self.info))
+
+    @unittest.skipIf(brainspy.TEST_MODE != "HARDWARE_CDAQ",
+                     "Hardware test is skipped for simulation setup.")
+    def test_is_hardware_cdaq(self):
+        """
+        Test method for checking if processor is hardware for cdaq to cdaq.
+        """
+        self._run_hw_case(self.configs_cdaq,
+                          lambda p: self.assertTrue(p.is_hardware()))
+
+    @unittest.skipIf(brainspy.TEST_MODE != "HARDWARE_NIDAQ",
+                     "Hardware test is skipped for simulation setup.")
+    def test_is_hardware_nidaq(self):
+        """
+        Test method for checking if processor is hardware for cdaq to nidaq.
+        """
+        self._run_hw_case(self.configs_nidaq,
+                          lambda p: self.assertTrue(p.is_hardware()))
+
+
+if __name__ == "__main__":
+    unittest.main()
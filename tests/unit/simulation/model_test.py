@@ -8,20 +8,50 @@ import random
 import torch
 from torch import nn
 from brainspy.utils.pytorch import TorchUtils
-from brainspy.processors.simulation.model import NeuralNetworkModel
+from brainspy.processors.simulation.model import (NeuralNetworkModel,
+                                                  FusedLinearReLU)
 
 
 class ModelTest(unittest.TestCase):
     """
     Class for testing 'model.py'.
     """
+    @classmethod
+    def setUpClass(cls):
+        """
+        Create a model with the default structure, shared by the tests that
+        do not change it or count the warnings raised when creating it, and
+        a TorchScript version of it for the forward pass tests. The scripted
+        model is warmed up with the inputs of test_forward, a single point and
+        a batch of points, so that its slower profiling runs for those shapes
+        are not part of the tests.
+        """
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            cls.default_model = NeuralNetworkModel({})
+        cls.default_model_jit = torch.jit.script(cls.default_model)
+        cls._forward_inputs = (torch.empty((7)), torch.empty((1000, 7)))
+        with torch.inference_mode():
+            for x in cls._forward_inputs:
+                for i in range(25):
+                    cls.default_model_jit(x)
+
+    def setUp(self):
+        """
+        Create a seeded generator for the tests that create models with
+        random sizes. It is created again for every test, so that each test
+        draws the same sizes whether it runs alone or with the others,
+        without seeding the global random module.
+        """
+        self._random = random.Random(0xB4A1)
+
     def test_init_default(self):
         """
         Test to generate a model with default parameters raises 4 warnings
         and is an instance of nn.Sequential
         """
         with warnings.catch_warnings(record=True) as caught_warnings:
-            warnings.simplefilter("always")
+            warnings.simplefilter("always", category=UserWarning)
             model = NeuralNetworkModel({})
             self.assertEqual(len(caught_warnings), 4)
         self.assertFalse(model.verbose)
@@ -33,7 +63,7 @@ class ModelTest(unittest.TestCase):
         and generates a model with default parameters
         """
         with warnings.catch_warnings(record=True) as caught_warnings:
-            warnings.simplefilter("always")
+            warnings.simplefilter("always", category=UserWarning)
             model = NeuralNetworkModel(None)
             self.assertEqual(len(caught_warnings), 4)
         self.assertFalse(model.verbose)
@@ -44,7 +74,7 @@ class ModelTest(unittest.TestCase):
         Test to generate a model with a dict raises no warnings
         """
         with warnings.catch_warnings(record=True) as caught_warnings:
-            warnings.simplefilter("always")
+            warnings.simplefilter("always", category=UserWarning)
             model_structure = {
                 "D_in": 7,
                 "D_out": 1,
@@ -58,7 +88,7 @@ class ModelTest(unittest.TestCase):
         Test to generate a model with partial dict raises warnings
         """
         with warnings.catch_warnings(record=True) as caught_warnings:
-            warnings.simplefilter("always")
+            warnings.simplefilter("always", category=UserWarning)
             model_structure = {
                 "activation": "relu",
                 "hidden_sizes": [20, 20, 20]
@@ -72,8 +102,8 @@ class ModelTest(unittest.TestCase):
         raises Assertion error
         """
         model_structure = {
-            "D_in": random.randint(-10, -1),
-            "D_out": random.randint(-10, -1),
+            "D_in": self._random.randint(-10, -1),
+            "D_out": self._random.randint(-10, -1),
             "activation": "relu",
             "hidden_sizes": [20, 20, 20]
         }
@@ -86,7 +116,7 @@ class ModelTest(unittest.TestCase):
         Initializing zero-element tensors is a no-op
         """
         with warnings.catch_warnings(record=True) as caught_warnings:
-            warnings.simplefilter("always")
+            warnings.simplefilter("always", category=UserWarning)
             model_structure = {
                 "D_in": 5,
                 "D_out": 0,
@@ -100,7 +130,7 @@ class ModelTest(unittest.TestCase):
         Initializing zero-element tensors is a no-op
         """
         with warnings.catch_warnings(record=True) as caught_warnings:
-            warnings.simplefilter("always")
+            warnings.simplefilter("always", category=UserWarning)
             model_structure = {
                 "D_in": 7,
                 "D_out": 1,
@@ -148,30 +178,25 @@ class ModelTest(unittest.TestCase):
     def test_init_random(self):
         """
         Test to generate a model with random values for D_in,
-        D_out and hidden_sizes
-        If the method fails, the cpu cannot allocate enough bytes
+        D_out and hidden_sizes. The sizes are kept small so that the model
+        always fits in memory.
         """
         threshold_electrodes = 20
-        threshold_hidden_sizes = 90
-        threshold_hidden_layer_no = 10
+        threshold_hidden_sizes = 32
+        threshold_hidden_layer_no = 4
         model_structure = {
             "D_in":
-            random.randint(0, threshold_electrodes),
+            self._random.randint(0, threshold_electrodes),
             "D_out":
-            random.randint(0, threshold_electrodes),
+            self._random.randint(0, threshold_electrodes),
             "activation":
             "relu",
             "hidden_sizes": [
-                random.randint(0, threshold_hidden_sizes)
+                self._random.randint(0, threshold_hidden_sizes)
                 for i in range(threshold_hidden_layer_no)
             ]
         }
-        try:
-            NeuralNetworkModel(model_structure)
-        except (Exception):
-            self.fail(
-                "Could not generate model : DefaultCPUAllocator: not enough memory"
-            )
+        NeuralNetworkModel(model_structure)
 
     def test_init_type_dict_typeerror(self):
         """
@@ -187,15 +212,170 @@ class ModelTest(unittest.TestCase):
         Test build_model_structure and checking length of raw model:
         input layer, 6 activations, 5 hidden layers, output layer
         """
-        model = NeuralNetworkModel({})
+        model = self.default_model
         raw = model.raw_model
         self.assertEqual(len(raw), 13)
 
+    def test_build_model_structure_activations(self):
+        """
+        Test that every layer of the raw model has its own activation
+        instance.
+        """
+        model = NeuralNetworkModel({
+            "D_in": 7,
+            "D_out": 1,
+            "activation": "tanh",
+            "hidden_sizes": [20, 20, 20]
+        })
+        activations = [model.raw_model[i] for i in range(1, 6, 2)]
+        for activation in activations:
+            self.assertIsInstance(activation, nn.Tanh)
+        self.assertEqual(len(set(map(id, activations))), 3)
+
+    def test_compile_for_inference(self):
+        """
+        Test that compile_for_inference compiles the raw model with
+        TorchScript while keeping the weights that were loaded before, and
+        that the compiled model gives the same result as the eager one.
+        """
+        model_structure = {
+            "D_in": 7,
+            "D_out": 1,
+            "activation": "relu",
+            "hidden_sizes": [20, 20, 20]
+        }
+        trained_model = NeuralNetworkModel(model_structure)
+        model = NeuralNetworkModel(model_structure)
+        model.load_state_dict(trained_model.state_dict())
+        model.compile_for_inference()
+        self.assertFalse(model.training)
+        self.assertIsInstance(model.raw_model, torch.jit.ScriptModule)
+        self.assertEqual(list(model.state_dict().keys()),
+                         list(trained_model.state_dict().keys()))
+        x = torch.rand((10, 7))
+        with torch.no_grad():
+            self.assertTrue(
+                torch.allclose(model.forward(x), trained_model.forward(x)))
+
+    def test_freeze_for_inference(self):
+        """
+        Test that freezing the model inlines the layers into a single graph
+        and folds the loaded weights into it as constants, so it no longer
+        has parameters and gives the same result as the eager model. A frozen
+        model can no longer load a state dictionary.
+        """
+        model_structure = {
+            "D_in": 7,
+            "D_out": 1,
+            "activation": "relu",
+            "hidden_sizes": [20, 20, 20]
+        }
+        trained_model = NeuralNetworkModel(model_structure)
+        model = NeuralNetworkModel(model_structure)
+        model.load_state_dict(trained_model.state_dict())
+        model.compile_for_inference()
+        self.assertIn("prim::CallMethod", str(model.raw_model.graph))
+        self.assertIn("prim::GetAttr[name=\"weight\"]",
+                      str(model.raw_model.inlined_graph))
+        model.freeze_for_inference()
+        self.assertFalse(model.training)
+        self.assertIsInstance(model.raw_model, torch.jit.ScriptModule)
+        self.assertEqual(len(list(model.raw_model.parameters())), 0)
+        self.assertNotIn("prim::CallMethod", str(model.raw_model.graph))
+        self.assertNotIn("prim::GetAttr[name=\"weight\"]",
+                         str(model.raw_model.inlined_graph))
+        x = torch.rand((10, 7))
+        with torch.no_grad():
+            self.assertTrue(
+                torch.allclose(model.forward(x), trained_model.forward(x)))
+        with self.assertRaises(RuntimeError):
+            model.load_state_dict(trained_model.state_dict())
+
+    def test_compile_for_inference_static_fusion(self):
+        """
+        Test that the TorchScript fusion strategy of the process is only
+        changed when static_fusion is set.
+        """
+        model_structure = {
+            "D_in": 7,
+            "D_out": 1,
+            "activation": "relu",
+            "hidden_sizes": [20, 20, 20]
+        }
+        default_strategy = [("STATIC", 2), ("DYNAMIC", 10)]
+        strategy = torch.jit.set_fusion_strategy(default_strategy)
+        try:
+            NeuralNetworkModel(model_structure).compile_for_inference()
+            self.assertEqual(torch.jit.set_fusion_strategy(default_strategy),
+                             default_strategy)
+            NeuralNetworkModel(model_structure).compile_for_inference(
+                static_fusion=True)
+            self.assertEqual(torch.jit.set_fusion_strategy(default_strategy),
+                             [("STATIC", 1)])
+        finally:
+            torch.jit.set_fusion_strategy(strategy)
+
+    def test_compile_for_inference_torch_compile(self):
+        """
+        Test that with torch_compile the raw model is compiled in place, so
+        it is not converted to TorchScript and keeps its state dictionary.
+        The compilation itself only happens on the first forward pass, which
+        is not run here.
+        """
+        model = NeuralNetworkModel({
+            "D_in": 7,
+            "D_out": 1,
+            "activation": "relu",
+            "hidden_sizes": [20, 20, 20]
+        })
+        keys = list(model.state_dict().keys())
+        model.compile_for_inference(torch_compile=True)
+        self.assertIsInstance(model.raw_model, nn.Sequential)
+        self.assertEqual(list(model.state_dict().keys()), keys)
+
+    def test_fused_linear_relu(self):
+        """
+        Test that FusedLinearReLU gives the same output and gradients as a
+        linear layer followed by a ReLU, for batched and single inputs.
+        """
+        fused = FusedLinearReLU(7, 20)
+        linear = nn.Linear(7, 20)
+        linear.load_state_dict(fused.state_dict())
+        for size in ((10, 7), (7, ), (2, 10, 7)):
+            x = torch.rand(size, requires_grad=True)
+            x_ref = x.detach().clone().requires_grad_()
+            result = fused(x)
+            target = torch.relu(linear(x_ref))
+            self.assertTrue(torch.allclose(result, target))
+            result.sum().backward()
+            target.sum().backward()
+            self.assertTrue(torch.allclose(x.grad, x_ref.grad))
+
+    def test_build_model_structure_state_dict(self):
+        """
+        Test that the state dictionary of a model with relu activation has
+        the same keys as a sequence of linear layers and activations, so that
+        previously saved models can be loaded.
+        """
+        model = NeuralNetworkModel({
+            "D_in": 7,
+            "D_out": 1,
+            "activation": "relu",
+            "hidden_sizes": [20, 20, 20]
+        })
+        reference = nn.Sequential(nn.Linear(7, 20), nn.ReLU(),
+                                  nn.Linear(20, 20), nn.ReLU(),
+                                  nn.Linear(20, 20), nn.ReLU(),
+                                  nn.Linear(20, 1))
+        model.raw_model.load_state_dict(reference.state_dict())
+        x = torch.rand((10, 7))
+        self.assertTrue(torch.allclose(model.forward(x), reference(x)))
+
     def test_get_activation(self):
         """
         Test get_activation.
         """
-        model = NeuralNetworkModel({})
+        model = self.default_model
         self.assertIsInstance(model._get_activation("relu"), nn.ReLU)
         self.assertIsInstance(model._get_activation("elu"), nn.ELU)
         self.assertIsInstance(model._get_activation("tanh"), nn.Tanh)
@@ -207,19 +387,19 @@ class ModelTest(unittest.TestCase):
         Invalid type for get_activation raises a warning and returns
         nn.Relu activation type
         """
-        model = NeuralNetworkModel({})
+        model = self.default_model
         with warnings.catch_warnings(record=True) as caught_warnings:
-            warnings.simplefilter("always")
+            warnings.simplefilter("always", category=UserWarning)
             self.assertIsInstance(model._get_activation("test"), nn.ReLU)
             self.assertEqual(len(caught_warnings), 1)
 
         with warnings.catch_warnings(record=True) as caught_warnings:
-            warnings.simplefilter("always")
+            warnings.simplefilter("always", category=UserWarning)
             self.assertIsInstance(model._get_activation([1, 2, 3, 4]), nn.ReLU)
             self.assertEqual(len(caught_warnings), 1)
 
         with warnings.catch_warnings(record=True) as caught_warnings:
-            warnings.simplefilter("always")
+            warnings.simplefilter("always", category=UserWarning)
             self.assertIsInstance(model._get_activation(None), nn.ReLU)
             self.assertEqual(len(caught_warnings), 1)
 
@@ -227,21 +407,33 @@ class ModelTest(unittest.TestCase):
         """
         Test if info_consistency_check makes the necessary adjustments.
         """
-        model = NeuralNetworkModel({})
+        model = self.default_model
         with warnings.catch_warnings(record=True) as caught_warnings:
-            warnings.simplefilter("always")
+            warnings.simplefilter("always", category=UserWarning)
             d = {}
             model.structure_consistency_check(d)
             self.assertTrue("D_out" in d)
             self.assertTrue("hidden_sizes" in d)
             self.assertTrue("activation" in d)
             self.assertEqual(len(caught_warnings), 4)
+        self.assertEqual(
+            str(caught_warnings[-1].message),
+            "The model loaded does not define the hidden layer sizes as "
+            "expected. Changed it to default value: 6 layers of 90.")
+        self.assertEqual(d["hidden_sizes"], [90] * 6)
+        d["hidden_sizes"].append(10)
+        with warnings.catch_warnings(record=True) as caught_warnings:
+            warnings.simplefilter("always", category=UserWarning)
+            d = {}
+            model.structure_consistency_check(d)
+            self.assertEqual(len(caught_warnings), 4)
+        self.assertEqual(d["hidden_sizes"], [90] * 6)
 
     def test_consistancy_check_typeerror(self):
         """
         Invalid type for structure_consistency_check raises TypeError
         """
-        model = NeuralNetworkModel({})
+        model = self.default_model
         with self.assertRaises(TypeError):
             model.structure_consistency_check(None)
         with self.assertRaises(TypeError):
@@ -251,33 +443,121 @@ class ModelTest(unittest.TestCase):
 
     def test_forward(self):
         """
-        Test the forward pass, check whether result has right shape.
-        """
-        model = NeuralNetworkModel({})
-        for i in range(1, 1000):
-            x = torch.rand((7))
-            result = model.forward(x)
-            test = torch.rand((1))
-            self.assertEqual(result.shape, test.shape)
+        Test the forward pass, check whether result has right shape, both for
+        a single point and for a batch of points, for the eager and the
+        scripted model.
+        """
+        models = (("eager", self.default_model),
+                  ("jit", self.default_model_jit))
+        with torch.inference_mode():
+            for name, model in models:
+                with self.subTest(model=name):
+                    point, batch = self._forward_inputs
+                    result = model.forward(point)
+                    self.assertEqual(result.shape, torch.Size([1]))
+                    result = model.forward(batch)
+                    self.assertEqual(result.shape, torch.Size([1000, 1]))
 
     def test_forward_fail(self):
         """
         Invalid size for torch tensor raises Runtime error
         """
+        model = self.default_model
         test_sizes = ((1, 1), (10, 1), (100, 1), (10, 2))
         for size in test_sizes:
-            model = NeuralNetworkModel({})
-            x = torch.rand(size,
-                           device=TorchUtils.get_device(),
-                           dtype=torch.get_default_dtype())
+            x = torch.empty(size,
+                            device=TorchUtils.get_device(),
+                            dtype=torch.get_default_dtype())
             with self.assertRaises(RuntimeError):
                 model.forward(x)
 
+    def test_forward_script(self):
+        """
+        Test that the whole model can be compiled with TorchScript, which
+        unrolls the layers of the raw model, and that the compiled model
+        gives the same result as the eager one.
+        """
+        model = NeuralNetworkModel({
+            "D_in": 7,
+            "D_out": 1,
+            "activation": "tanh",
+            "hidden_sizes": [20, 20, 20]
+        })
+        scripted_model = torch.jit.script(model)
+        x = torch.rand((10, 7))
+        self.assertTrue(torch.allclose(scripted_model(x), model.forward(x)))
+
+    @unittest.skipIf(torch.backends.quantized.engine == "none",
+                     "Quantization is not supported on this platform.")
+    def test_quantize(self):
+        """
+        Test that all the linear layers are quantized, and that the output of
+        the quantized model is close to that of the original one.
+        """
+        model = NeuralNetworkModel({
+            "D_in": 7,
+            "D_out": 1,
+            "activation": "relu",
+            "hidden_sizes": [20, 20, 20]
+        })
+        x = torch.rand((100, 7))
+        with torch.no_grad():
+            target = model.forward(x)
+            model.quantize()
+            result = model.forward(x)
+        self.assertEqual(len(model.raw_model), 7)
+        for i in range(0, 7, 2):
+            self.assertIsInstance(model.raw_model[i],
+                                  torch.ao.nn.quantized.dynamic.Linear)
+        self.assertTrue(torch.allclose(result, target, atol=0.1))
+
+    def test_quantize_fail(self):
+        """
+        Quantizing a compiled model raises an AssertionError
+        """
+        model = NeuralNetworkModel({})
+        model.raw_model = torch.jit.script(model.raw_model)
+        with self.assertRaises(AssertionError):
+            model.quantize()
+
+    def test_capture_graph_fail(self):
+        """
+        Capturing a CUDA graph for an input that is not on a CUDA device
+        raises an AssertionError
+        """
+        model = self.default_model
+        with self.assertRaises(AssertionError):
+            model.capture_graph(torch.rand((10, 7), device="cpu"))
+
+    def test_forward_graph_fallback(self):
+        """
+        Without a captured graph, forward_graph gives the same result as
+        the forward pass
+        """
+        model = self.default_model
+        x = torch.rand((10, 7))
+        self.assertTrue(torch.equal(model.forward_graph(x), model.forward(x)))
+
+    @unittest.skipUnless(torch.cuda.is_available(),
+                         "CUDA graphs require a CUDA device.")
+    def test_forward_graph(self):
+        """
+        Test that replaying the captured graph gives the same result as the
+        forward pass
+        """
+        model = NeuralNetworkModel({}).to("cuda")
+        model.capture_graph(torch.zeros((10, 7), device="cuda"))
+        for i in range(3):
+            x = torch.rand((10, 7), device="cuda")
+            with torch.no_grad():
+                self.assertTrue(
+                    torch.allclose(model.forward_graph(x), model.forward(x)))
+
     def test_forward_typeerror(self):
         """
         Invalid type for forward pass raises TypeError
         """
-        model = NeuralNetworkModel({})
+        model = self.default_model
         x = [1, 2, 3, 4]
         with self.assertRaises(TypeError):
             model.forward(x)